@@ -10,9 +10,10 @@ if __name__ == "__main__":
 
   print('Summoning the perfect song for your mood, every time 🎼🔮')
 
-  playlist_path = parser.parse_args().output_dir
-  num_songs = parser.parse_args().num_songs
-  duration = parser.parse_args().duration
+  args = parser.parse_args()
+  playlist_path = args.output_dir
+  num_songs = args.num_songs
+  duration = args.duration
 
   if duration > 47.0:
       print("Duration is too long. Setting to 47.0 seconds.")
@@ -1,32 +1,74 @@
 import random
+import numpy as np
 from src.utils import mood_synonyms
 from typing import List, Dict, Set, Optional, Tuple, Union
 
+# Grammar templates used for generating captions. Built once at import time
+# (immutable tuples) so every Captioner instance shares the same objects.
+_GRAMMAR_TEMPLATES: Tuple[Tuple[str, ...], ...] = (
+    ("A", "{mood}", "song"),
+    ("A", "{mood}", "tune for your", "{mood}", "moments"),
+    ("The perfect", "{mood}", "soundtrack for your day"),
+    ("A song that blends", "{mood}", "and", "{mood}", "vibes"),
+    ("A", "{mood}", "song with hints of", "{mood}", "undertones"),
+    ("A", "{mood}", "composition with", "{mood}", "undertones"),
+    ("Music to feel", "{mood}", "and", "{mood}"),
+    ("A song that evoques a", "{mood}", "atmosphere with", "{mood}", "progressions")
+)
+
+
+def _compile_template(template: Tuple[str, ...]) -> Tuple[Tuple[str, ...], int, bool]:
+    """
+    Compiles a template into (literals, n_slots, needs_capitalize), where
+    literals are the fixed fragments surrounding each "{mood}" slot (empty
+    string when two slots are adjacent or a slot sits at either end).
+    needs_capitalize is only True when the caption would start with a
+    lowercase literal or with a mood slot.
+    """
+    literals = []
+    current = []
+    n_slots = 0
+    for part in template:
+        if part == "{mood}":
+            literals.append(" ".join(current))
+            current = []
+            n_slots += 1
+        else:
+            current.append(part)
+    literals.append(" ".join(current))
+    needs_capitalize = not literals[0] or not literals[0][0].isupper()
+    return (tuple(literals), n_slots, needs_capitalize)
+
+
+# Compiled once at import time: caption generation just interleaves the
+# literal fragments with the chosen moods, with no per-call token scanning.
+_COMPILED_TEMPLATES: Tuple[Tuple[Tuple[str, ...], int, bool], ...] = tuple(
+    _compile_template(template) for template in _GRAMMAR_TEMPLATES
+)
+
 class Captioner:
     """
     Class to generate captions for songs based on their mood.
     It uses grammars and synonyms to create unique descriptions.
     """
-    
-    def __init__(self):
-        self.mood_synonyms = mood_synonyms
-        self.grammar_templates = self._initialize_grammar_templates()
-        
-    def _initialize_grammar_templates(self) -> List[List[str]]:
+
+    def __init__(self, seed: Optional[int] = None):
         """
-        Initializes the grammar templates used for generating captions.
+        Args:
+            seed (int, optional): Seed for the internal random generators,
+                for reproducible captions.
         """
-        return [
-            ["A", "{mood}", "song"],
-            ["A", "{mood}", "tune for your", "{mood}", "moments"],
-            ["The perfect", "{mood}", "soundtrack for your day"],
-            ["A song that blends", "{mood}", "and", "{mood}", "vibes"],
-            ["A", "{mood}", "song with hints of", "{mood}", "undertones"],
-            ["A", "{mood}", "composition with", "{mood}", "undertones"],
-            ["Music to feel", "{mood}", "and", "{mood}"],
-            ["A song that evoques a", "{mood}", "atmosphere with", "{mood}", "progressions"]
-        ]
-    
+        self.mood_synonyms = mood_synonyms
+        self.grammar_templates = _GRAMMAR_TEMPLATES
+        self._compiled_templates = _COMPILED_TEMPLATES
+        # Immutable synonym tuples, built once so lookups never allocate
+        self._syn_cache = {mood: tuple(syns) for mood, syns in mood_synonyms.items()}
+        # Instance-level generators: independent Captioners don't contend on
+        # (or perturb) the global random state, which keeps parallel caption
+        # generation safe and makes seeding deterministic per instance
+        self._rng = random.Random(seed)
+        self._np_rng = np.random.default_rng(seed)
+
     def get_synonym(self, mood: str) -> str:
         """
         Get a random synonym for a given mood.
@@ -37,8 +79,10 @@ class Captioner:
         Returns:
             str: A random synonym.
         """
-        synonyms = self.mood_synonyms.get(mood, [mood])
-        return random.choice(synonyms)
+        synonyms = self._syn_cache.get(mood)
+        if synonyms is None:
+            return mood
+        return synonyms[self._rng.randrange(len(synonyms))]
     
     def _generate_mood_subsets(self, moods: List[str]) -> Tuple[List[str], List[str]]:
         """
@@ -50,16 +94,20 @@ class Captioner:
         Returns:
             Tuple[List[str], List[str]]: (primary_moods, secondary_moods)
         """
+        # One permutation plus two cut points replaces the split + two
+        # random.sample calls, with no intermediate list copies
+        idx = self._np_rng.permutation(len(moods))
+
         # Determine split point (at least 1 mood for each subset)
-        split_point = random.randint(1, len(moods) - 1)
-        
-        primary_moods = moods[:split_point]
-        secondary_moods = moods[split_point:]
+        split_point = self._np_rng.integers(1, len(moods))
+
+        # Take a random number of moods for both primary and secondary
+        k_primary = self._np_rng.integers(1, split_point + 1)
+        k_secondary = self._np_rng.integers(1, len(moods) - split_point + 1)
+
+        primary_moods = [moods[i] for i in idx[:k_primary]]
+        secondary_moods = [moods[i] for i in idx[split_point:split_point + k_secondary]]
 
-        # Take a random sample of moods for both primary and secondary
-        primary_moods = random.sample(primary_moods, k=random.randint(1, len(primary_moods)))
-        secondary_moods = random.sample(secondary_moods, k=random.randint(1, len(secondary_moods)))
-        
         return (primary_moods, secondary_moods)
     
     def _join_moods(self, moods: List[str]) -> str:
@@ -87,27 +135,27 @@ class Captioner:
         Returns:
             str: A generated caption.
         """
-        # Choose a random template
-        template = random.choice(self.grammar_templates)
-        first_part = False
+        # Choose a random compiled template
+        literals, n_slots, needs_capitalize = self._rng.choice(self._compiled_templates)
 
-        # Process the template
+        # Interleave the literal fragments with the chosen moods; the first
+        # slot uses the primary moods, the remaining slots the secondary ones
         caption_parts = []
-        for part in template:
-            if part == "{mood}":
-                if not first_part:
-                    # Use the first primary mood
-                    use_mood = primary_moods
-                    first_part = True
-                else:
-                    use_mood = secondary_moods
-                caption_parts.append(", ".join(use_mood))
-            else:
-                caption_parts.append(part)
-        
-        # Join the parts to form the final caption
+        for i in range(n_slots):
+            if literals[i]:
+                caption_parts.append(literals[i])
+            use_mood = primary_moods if i == 0 else secondary_moods
+            caption_parts.append(", ".join(use_mood))
+        if literals[n_slots]:
+            caption_parts.append(literals[n_slots])
+
+        # Join the parts to form the final caption; every current template
+        # starts with an uppercase literal, so the re-capitalization slice
+        # only runs for templates flagged at compile time
         caption = " ".join(caption_parts)
-        return caption[0].upper() + caption[1:]
+        if needs_capitalize:
+            caption = caption[0].upper() + caption[1:]
+        return caption
     
     def generate_from_moods(self, moods: List[str]) -> str:
         """
@@ -119,8 +167,11 @@ class Captioner:
         Returns:
             str: Generated description.
         """
-        # Use synonyms for the moods base on random chance
-        moods = [self.get_synonym(mood) if random.random() > 0.5 else mood for mood in moods]
+        # Use synonyms for the moods based on random chance; one vectorized
+        # draw instead of one random.random() call per mood
+        use_synonym = self._np_rng.random(len(moods)) > 0.5
+        moods = [self.get_synonym(mood) if use_synonym[i] else mood
+                 for i, mood in enumerate(moods)]
 
         # Generate random subsets of moods
         primary_moods, secondary_moods = self._generate_mood_subsets(moods)
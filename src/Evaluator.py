@@ -1,11 +1,58 @@
 import os
+import hashlib
+import threading
 import numpy as np
-import matplotlib.pyplot as plt
 from typing import List, Dict, Tuple, Optional, Union
-from essentia.standard import MonoLoader, TensorflowPredictVGGish, TensorflowPredict2D
-from scipy.spatial.distance import euclidean
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-import matplotlib.colors as mcolors
+
+# matplotlib and essentia (which pulls in TensorFlow) cost seconds to
+# import, so they are loaded lazily in the methods that need them.
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Below this size the NumPy path beats the JIT dispatch overhead
+_NUMBA_MIN_SONGS = 8
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _metrics_kernel(av: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Fused single-pass computation of the playlist metrics: consecutive
+        distances, center distances, center and per-axis variances.
+        """
+        n = av.shape[0]
+        mean_a = 0.0
+        mean_v = 0.0
+        for i in range(n):
+            mean_a += av[i, 0]
+            mean_v += av[i, 1]
+        mean_a /= n
+        mean_v /= n
+
+        distances = np.empty(n - 1)
+        center_distances = np.empty(n)
+        var_a = 0.0
+        var_v = 0.0
+        for i in range(n):
+            da = av[i, 0] - mean_a
+            dv = av[i, 1] - mean_v
+            center_distances[i] = (da * da + dv * dv) ** 0.5
+            var_a += da * da
+            var_v += dv * dv
+            if i < n - 1:
+                sa = av[i + 1, 0] - av[i, 0]
+                sv = av[i + 1, 1] - av[i, 1]
+                distances[i] = (sa * sa + sv * sv) ** 0.5
+
+        center = np.array([mean_a, mean_v])
+        variances = np.array([var_a / n, var_v / n])
+        return distances, center_distances, center, variances
+else:
+    _metrics_kernel = None
 
 
 class Evaluator:
@@ -21,32 +68,65 @@ class Evaluator:
         Args:
             models_dir (str): Directory where the models are stored.
         """
-        
+        # Imported here so that the math-only paths (metrics on precomputed
+        # data) never pay the essentia/TensorFlow import cost
+        from essentia.standard import MonoLoader, TensorflowPredictVGGish, TensorflowPredict2D
+        self._mono_loader = MonoLoader
+
         # Initialize the models for arousal-valence prediction
         self.embeddings_model_av = TensorflowPredictVGGish(
-            graphFilename=model_path_embeddings, 
+            graphFilename=model_path_embeddings,
             output="model/vggish/embeddings"
         )
 
         self.av_classification_model = TensorflowPredict2D(
-            graphFilename=model_path_classification, 
+            graphFilename=model_path_classification,
             output="model/Identity"
         )
-    
+
+        # Essentia standard-mode algorithms keep mutable internal state per
+        # compute() and are not thread-safe; this lock serializes the shared
+        # predictors while decodes still run in parallel
+        self._model_lock = threading.Lock()
+
+        # Directory for cached arousal-valence predictions (.npy sidecars)
+        self._av_cache_dir = Path(".av_cache")
+
+    def _av_cache_path(self, wav_filepath: str) -> Path:
+        """
+        Build the cache file path for an audio file, keyed by its path,
+        modification time and size so edits invalidate the entry.
+        """
+        key = f"{wav_filepath}_{os.path.getmtime(wav_filepath)}_{os.path.getsize(wav_filepath)}"
+        return self._av_cache_dir / f"{hashlib.sha1(key.encode()).hexdigest()}.npy"
+
     def get_arousal_valence(self, wav_filepath: str) -> Tuple[float, float]:
         """
         Extract arousal and valence values from an audio file.
-        
+        Results are cached on disk, so re-analyzing an unchanged file skips
+        the VGGish inference entirely.
+
         Args:
             wav_filepath (str): Path to the audio file.
-            
+
         Returns:
             Tuple[float, float]: Tuple containing (arousal, valence) values.
         """
-        audio = MonoLoader(filename=wav_filepath, sampleRate=16000, resampleQuality=4)()
-        embeddings = self.embeddings_model_av(audio)
-        predictions = self.av_classification_model(embeddings)
+        cache_path = self._av_cache_path(wav_filepath)
+        if cache_path.exists():
+            arousal, valence = np.load(cache_path)
+            return arousal, valence
+
+        audio = self._mono_loader(filename=wav_filepath, sampleRate=16000, resampleQuality=4)()
+        # The loader above is a fresh instance per call, but the two
+        # predictors are shared across threads and must run one at a time
+        with self._model_lock:
+            embeddings = self.embeddings_model_av(audio)
+            predictions = self.av_classification_model(embeddings)
         arousal, valence = np.mean(predictions, axis=0)
+
+        self._av_cache_dir.mkdir(exist_ok=True)
+        np.save(cache_path, np.array([arousal, valence]))
         return arousal, valence
     
     def analyze_playlist(self, playlist_dir: str) -> Dict:
@@ -59,87 +139,116 @@ class Evaluator:
         Returns:
             Dict: Dictionary with analysis results, including songs data and metrics.
         """
-        # Get all wav files in the directory
-        audio_files = [os.path.join(playlist_dir, f) for f in os.listdir(playlist_dir) 
-                      if f.endswith('.wav') or f.endswith('.mp3')]
-        audio_files.sort()  # Ensure consistent ordering
+        # Get all audio files in the directory; scandir avoids extra stat
+        # calls and sorting ensures consistent ordering
+        with os.scandir(playlist_dir) as entries:
+            audio_files = sorted(entry.path for entry in entries
+                                 if entry.is_file() and entry.name.endswith(('.wav', '.mp3')))
         
         if not audio_files:
             return {"error": "No audio files found in the specified directory"}
         
         songs_data = []
+
+        # Process the songs in parallel; the per-call decodes overlap while
+        # the shared predictors run one song at a time behind _model_lock
+        with ThreadPoolExecutor(max_workers=min(4, len(audio_files))) as executor:
+            futures = {executor.submit(self.get_arousal_valence, file_path): (i, file_path)
+                       for i, file_path in enumerate(audio_files)}
+
+            for future in as_completed(futures):
+                i, file_path = futures[future]
+                try:
+                    arousal, valence = future.result()
+                except Exception as e:
+                    print(f"Error processing {file_path}: {e}")
+                    continue
+
+                # Keep the model's native float32 instead of widening to
+                # Python float (float64); halves the metrics memory traffic
+                songs_data.append({
+                    "id": i,
+                    "filename": os.path.basename(file_path),
+                    "path": file_path,
+                    "arousal": np.float32(arousal),
+                    "valence": np.float32(valence)
+                })
+
+        # as_completed yields in finish order; restore the playlist order
+        songs_data.sort(key=lambda song: song["id"])
+
+        if not songs_data:
+            return {"error": "No audio files could be processed"}
         
-        # Process each song
-        for i, file_path in enumerate(audio_files):
-            filename = os.path.basename(file_path)
-            arousal, valence = self.get_arousal_valence(file_path)
-            
-            songs_data.append({
-                "id": i,
-                "filename": filename,
-                "path": file_path,
-                "arousal": float(arousal),
-                "valence": float(valence)
-            })
-        
+        # Build the arousal-valence array once and reuse it for all metrics
+        av = np.array([[song["arousal"], song["valence"]] for song in songs_data], dtype=np.float32)
+
         # Calculate metrics
-        metrics = self._calculate_metrics(songs_data)
-        
+        metrics = self._calculate_metrics(songs_data, av)
+
         return {
             "songs": songs_data,
             "metrics": metrics
         }
-    
-    def _calculate_metrics(self, songs_data: List[Dict]) -> Dict:
+
+    def _calculate_metrics(self, songs_data: List[Dict], av: Optional[np.ndarray] = None) -> Dict:
         """
         Calculate various metrics to evaluate playlist coherence.
-        
+
         Args:
             songs_data (List[Dict]): List of dictionaries containing song data.
-            
+            av (np.ndarray, optional): Precomputed (N, 2) array of arousal-valence
+                pairs. Built from songs_data when not provided.
+
         Returns:
             Dict: Dictionary containing the calculated metrics.
         """
         metrics = {}
-        
-        # Extract arousal-valence pairs
-        av_pairs = [(song["arousal"], song["valence"]) for song in songs_data]
-        
+
+        # Extract arousal-valence pairs as a single (N, 2) array
+        if av is None:
+            av = np.array([[song["arousal"], song["valence"]] for song in songs_data], dtype=np.float32)
+
+        # Long playlists use the fused JIT kernel when numba is available;
+        # short ones stay on NumPy where kernel dispatch would dominate
+        if _metrics_kernel is not None and len(av) >= _NUMBA_MIN_SONGS:
+            distances, center_distances, center, variances = _metrics_kernel(av)
+        else:
+            distances = np.linalg.norm(np.diff(av, axis=0), axis=1)
+            center = av.mean(axis=0)
+            center_distances = np.linalg.norm(av - center, axis=1)
+            variances = av.var(axis=0)
+
         # 1. Average distance between consecutive songs
-        if len(av_pairs) > 1:
-            distances = [euclidean(av_pairs[i], av_pairs[i+1]) for i in range(len(av_pairs)-1)]
+        if len(distances) > 0:
             metrics["avg_consecutive_distance"] = float(np.mean(distances))
-            
+
             # 2. Maximum distance between consecutive songs
             metrics["max_consecutive_distance"] = float(np.max(distances))
-            
+
             # Store all distances for detailed analysis
-            metrics["consecutive_distances"] = [float(d) for d in distances]
+            metrics["consecutive_distances"] = distances.tolist()
         else:
             metrics["avg_consecutive_distance"] = 0.0
             metrics["max_consecutive_distance"] = 0.0
             metrics["consecutive_distances"] = []
-        
+
         # 3. Average arousal and valence (center)
-        avg_arousal = np.mean([song["arousal"] for song in songs_data])
-        avg_valence = np.mean([song["valence"] for song in songs_data])
-        metrics["avg_arousal"] = float(avg_arousal)
-        metrics["avg_valence"] = float(avg_valence)
-        
+        metrics["avg_arousal"] = float(center[0])
+        metrics["avg_valence"] = float(center[1])
+
         # 4. Distances from center
-        center = (avg_arousal, avg_valence)
-        center_distances = [euclidean((song["arousal"], song["valence"]), center) for song in songs_data]
         metrics["avg_center_distance"] = float(np.mean(center_distances))
         metrics["max_center_distance"] = float(np.max(center_distances))
-        metrics["center_distances"] = [float(d) for d in center_distances]
-        
+        metrics["center_distances"] = center_distances.tolist()
+
         # 5. Variance in arousal and valence
-        metrics["arousal_variance"] = float(np.var([song["arousal"] for song in songs_data]))
-        metrics["valence_variance"] = float(np.var([song["valence"] for song in songs_data]))
-        
+        metrics["arousal_variance"] = float(variances[0])
+        metrics["valence_variance"] = float(variances[1])
+
         # 6. Total traverse distance (sum of all consecutive distances)
         metrics["total_traverse_distance"] = float(np.sum(metrics["consecutive_distances"]))
-        
+
         return metrics
     
     def plot_arousal_valence_plane(self, 
@@ -161,6 +270,10 @@ class Evaluator:
         Raises:
             ValueError: If the input data is malformed or missing required fields.
         """
+        # Lazy import: only plotting pays the matplotlib cost
+        import matplotlib.pyplot as plt
+        from matplotlib.collections import LineCollection
+
         # Validate input data
         if not playlist_data or 'songs' not in playlist_data or 'metrics' not in playlist_data:
             raise ValueError("Input data must contain 'songs' and 'metrics' keys")
@@ -203,36 +316,40 @@ class Evaluator:
         cbar = plt.colorbar(sm, ax=ax)
         cbar.set_label('Song Sequence')
 
-        # Plot each song
-        for i, song in enumerate(songs):
-            color_val = i / max(1, len(songs) - 1)  # Normalize to [0, 1]
-            color = cmap(color_val)
-            
-            if i == 0 and highlight_first:
-                # Highlight the first song with a different marker and label
-                ax.scatter(song["valence"], song["arousal"], s=150, color='red', 
-                        marker='*', label="First Song", zorder=5)
-            else:
-                ax.scatter(song["valence"], song["arousal"], s=100, color=color, 
-                        alpha=0.7, zorder=4)
-            
-            # Add song number label
-            ax.annotate(str(i+1), (song["valence"], song["arousal"]), 
-                    fontsize=10, ha='center', va='center', color='white', 
+        valences = np.array([song["valence"] for song in songs])
+        arousals = np.array([song["arousal"] for song in songs])
+
+        # Plot all songs with a single vectorized scatter call
+        start = 1 if highlight_first else 0
+        if highlight_first:
+            # Highlight the first song with a different marker and label
+            ax.scatter(valences[0], arousals[0], s=150, color='red',
+                    marker='*', label="First Song", zorder=5)
+        if len(songs) > start:
+            ax.scatter(valences[start:], arousals[start:], s=100,
+                    c=np.arange(start, len(songs)), cmap=cmap,
+                    norm=plt.Normalize(0, max(1, len(songs) - 1)),
+                    alpha=0.7, zorder=4)
+
+        # Add song number labels
+        for i in range(len(songs)):
+            ax.annotate(str(i+1), (valences[i], arousals[i]),
+                    fontsize=10, ha='center', va='center', color='white',
                     fontweight='bold', zorder=6)
-        
-        # Plot the trajectory line
+
+        # Plot the trajectory line as one LineCollection (a single artist)
+        # instead of one annotation per segment
         if len(songs) > 1:
-            points = [(song["valence"], song["arousal"]) for song in songs]
-            breakpoint()
-            
-            # Draw arrows connecting consecutive points to show direction
-            for i in range(len(points) - 1):
-                color_val = i / max(1, len(songs) - 2)  # Normalize to [0, 1]
-                color = cmap(color_val)
-                
-                ax.annotate('', xy=points[i+1], xytext=points[i],
-                        arrowprops=dict(arrowstyle='->', color=color, linewidth=2, alpha=0.7))
+            points = np.column_stack([valences, arousals])
+            segments = np.stack([points[:-1], points[1:]], axis=1)
+            colors = cmap(np.linspace(0, 1, len(points) - 1))
+
+            lc = LineCollection(segments, colors=colors, linewidths=2, alpha=0.7)
+            ax.add_collection(lc)
+
+            # Single arrow at the head to show the direction of travel
+            ax.annotate('', xy=points[-1], xytext=points[-2],
+                    arrowprops=dict(arrowstyle='->', color=colors[-1], linewidth=2, alpha=0.7))
         
         # Add central point (average arousal-valence)
         metrics = playlist_data["metrics"]
@@ -1,5 +1,6 @@
 
-from essentia.standard import MonoLoader, TensorflowPredictEffnetDiscogs, TensorflowPredict2D
+import os
+from essentia.standard import MonoLoader, Resample, TensorflowPredictEffnetDiscogs, TensorflowPredict2D
 from src.utils import mood_tags
 import numpy as np
 
@@ -21,6 +22,42 @@ class Listener:
             output='model/Sigmoid',
         )
 
+        # Embeddings cached by (path, mtime, size) so re-listening to an
+        # unchanged file skips the decode and the Effnet forward
+        self._emb_cache = {}
+
+        # Tag array aligned with the activation vector, for mask indexing
+        self._mood_tags_arr = np.array(mood_tags)
+
+    def _get_embeddings(self, song_path):
+        '''
+        Loads a song and computes its Effnet embeddings, reusing the cached
+        result when the file has not changed since the last call.
+
+        Args:
+          song_path (str): The path to the song file.
+
+        Returns:
+          The embeddings produced by the Effnet model.
+        '''
+        key = (song_path, os.path.getmtime(song_path), os.path.getsize(song_path))
+        embeddings = self._emb_cache.get(key)
+        if embeddings is None:
+            audio = MonoLoader(filename=song_path, sampleRate=32000)()
+            embeddings = self.embeddings_model_moods(audio)
+            self._emb_cache[key] = embeddings
+        return embeddings
+
+    def precompute(self, song_path):
+        '''
+        Warms the embedding cache for a song, so a later
+        get_moods_from_song call on the same file is free.
+
+        Args:
+          song_path (str): The path to the song file.
+        '''
+        self._get_embeddings(song_path)
+
     def get_moods_from_song(self, song_path, threshold=0.07):
         '''
         This function takes a song path and returns the moods detected in the song.
@@ -33,22 +70,50 @@ class Listener:
         Returns:
           list: A list of moods detected in the song.
         '''
-        audio = MonoLoader(filename=song_path, sampleRate=32000)()
+        embeddings = self._get_embeddings(song_path)
+        return self._moods_from_embeddings(embeddings, threshold)
+
+    def get_moods_from_audio(self, audio, sample_rate, threshold=0.07):
+        '''
+        Same as get_moods_from_song but takes audio already in memory,
+        skipping the WAV decode entirely. The audio is mixed down to mono
+        and resampled to the 32kHz the mood models expect.
+
+        Args:
+          audio (np.ndarray): Audio samples, (samples,) or (samples, channels).
+          sample_rate (int): Sample rate of the audio.
+          threshold (float): The threshold value to filter moods.
+
+        Returns:
+          list: A list of moods detected in the audio.
+        '''
+        audio = np.asarray(audio, dtype=np.float32)
+        if audio.ndim > 1:
+            audio = audio.mean(axis=1)
+        if sample_rate != 32000:
+            audio = Resample(inputSampleRate=sample_rate, outputSampleRate=32000, quality=4)(audio)
+
         embeddings = self.embeddings_model_moods(audio)
-        activations = self.mood_classification_model(embeddings)
+        return self._moods_from_embeddings(embeddings, threshold)
 
-        activation_avs = []
-        for i in range(len(activations[0])):
-            vals = [activations[j][i] for j in range(len(activations))]
-            activation_avs.append(sum(vals) / len(vals))
+    def _moods_from_embeddings(self, embeddings, threshold):
+        '''
+        Classifies the embeddings and selects the mood tags above the
+        threshold (or the top 4 when too few pass).
+        '''
+        activations = self.mood_classification_model(embeddings)
 
-        activations_dict = {tag: activation_avs[ind] for ind, tag in enumerate(mood_tags)}
+        # Average the per-tag activations across frames in one vectorized
+        # reduction instead of a Python double loop
+        activation_avs = np.asarray(activations, dtype=np.float32).mean(axis=0)
 
-        # Filter moods based on the threshold
-        moods_above_threshold = [mood for mood, value in activations_dict.items() if value > threshold]
-        if len(moods_above_threshold)  < 4:
-            # If no moods are above the threshold, return the top k moods
-            sorted_moods = sorted(activations_dict.items(), key=lambda item: item[1], reverse=True)
-            return [mood for mood, _ in sorted_moods[:4]]
+        # Filter moods based on the threshold, as a single vectorized
+        # comparison against the tag array
+        above = np.where(activation_avs > threshold)[0]
+        if above.size < 4:
+            # If not enough moods are above the threshold, return the top 4;
+            # argpartition selects them in O(K) instead of sorting
+            above = np.argpartition(activation_avs, -4)[-4:]
+            above = above[np.argsort(-activation_avs[above])]
 
-        return moods_above_threshold
\ No newline at end of file
+        return self._mood_tags_arr[above].tolist()
\ No newline at end of file
@@ -1,5 +1,6 @@
 import os
 import time
+import random
 import librosa
 import numpy as np
 from typing import List, Dict, Tuple, Optional, Union
@@ -23,7 +24,24 @@ class VibeSorcery:
     3. Creates new songs based on the generated captions using the Generator component. (Generator)
     4. Uses the generated songs as input for the next iteration.
     """
-    
+
+    # Components shared across VibeSorcery instances, keyed by their
+    # construction arguments: the Generator alone holds a multi-GB pipeline,
+    # so re-instantiating per playlist would reload it from disk every time
+    _component_cache = {}
+
+    @classmethod
+    def _get_component(cls, key, factory):
+        """
+        Returns the cached component for the given key, creating it with
+        the factory on the first request.
+        """
+        component = cls._component_cache.get(key)
+        if component is None:
+            component = factory()
+            cls._component_cache[key] = component
+        return component
+
     def __init__(self, 
                  models_dir: str = "models",
                  output_dir: str = "playlist", 
@@ -44,42 +62,76 @@ class VibeSorcery:
         os.makedirs(models_dir, exist_ok=True)
         os.makedirs(output_dir, exist_ok=True)
         
-        # Initialize components
-        self.listener = Listener()
-        self.captioner = Captioner()
-        self.generator = Generator(device=device, output_dir=output_dir)
+        # Initialize components, reusing already-loaded models when the
+        # construction arguments match
+        self.listener = self._get_component(("listener",), Listener)
+        self.captioner = self._get_component(("captioner",), Captioner)
+        self.generator = self._get_component(
+            ("generator", device, output_dir),
+            lambda: Generator(device=device, output_dir=output_dir))
         
         # Initialize the playlist
         self.playlist = []
-        
-    def generate_next_song(self, 
-                           input_song_path: str, 
+
+        # Waveform of the most recently generated song, handed to the next
+        # iteration so it never re-decodes the file it just wrote
+        self._last_audio = None
+
+        # Cached caption variants per mood set: mood sets tend to repeat
+        # across iterations, and reusing captions also stabilizes prompts
+        self._caption_cache = {}
+
+    def generate_next_song(self,
+                           input_song_path: str,
                            duration: float = 47.0,
-                           seed: Optional[int] = None) -> Dict:
+                           seed: Optional[int] = None,
+                           input_audio: Optional[np.ndarray] = None,
+                           input_sample_rate: Optional[int] = None) -> Dict:
         """
         Generates the next song in the playlist based on the input song.
-        
+
         Args:
             input_song_path (str): Path to the input audio file
             duration (float): Duration of the generated song in seconds
             seed (int, optional): Seed for reproducibility
-            
+            input_audio (np.ndarray, optional): In-memory audio of the input
+                song; when given together with input_sample_rate, the mood
+                detection skips decoding input_song_path from disk
+            input_sample_rate (int, optional): Sample rate of input_audio
+
         Returns:
             Dict: Information about the generated song, including file path, caption, and moods
         """
-        # Step 1: Detect the mood of the input song
-        moods = self.listener.get_moods_from_song(input_song_path)
-        
-        # Step 2: Generate a caption based on the detected moods
-        caption = self.captioner.generate_from_moods(moods)
-        
-        # Step 3: Generate the song using the generator
-        file_path = self.generator.generate_song(
+        # Step 1: Detect the mood of the input song, straight from memory
+        # when the caller already holds the waveform
+        if input_audio is not None and input_sample_rate is not None:
+            moods = self.listener.get_moods_from_audio(input_audio, input_sample_rate)
+        else:
+            moods = self.listener.get_moods_from_song(input_song_path)
+
+        # Step 2: Generate a caption based on the detected moods; repeated
+        # mood sets draw from up to three cached variants instead of
+        # running the Captioner again
+        key = tuple(moods)
+        variants = self._caption_cache.setdefault(key, [])
+        if len(variants) < 3:
+            caption = self.captioner.generate_from_moods(moods)
+            variants.append(caption)
+        else:
+            caption = random.choice(variants)
+
+        # Step 3: Generate the song, keeping the waveform for the next hop
+        result = self.generator.generate_song(
             prompt=caption,
             duration=duration,
-            seed=seed
+            seed=seed,
+            return_audio=True
         )
-        
+        if result is not None:
+            file_path, self._last_audio = result
+        else:
+            file_path, self._last_audio = None, None
+
         # Save the song information
         song_info = {
             "file_path": file_path,
@@ -120,9 +172,16 @@ class VibeSorcery:
         # Generate the rest of the songs
         for i in range(1, num_songs):
             print(f"Generating song {i+1}/{num_songs}...")
-            # Use the last generated song as input for the next one
-            last_song = self.generate_next_song(last_song["file_path"], duration, seed)
-        
+            # Use the last generated song as input for the next one; the
+            # waveform is still in memory, so no file decode is needed
+            last_song = self.generate_next_song(last_song["file_path"], duration, seed,
+                                                input_audio=self._last_audio,
+                                                input_sample_rate=self.generator.sampling_rate)
+        
+        # Make sure every song has been flushed to disk before handing the
+        # playlist back
+        self.generator.wait_for_writes()
+
         print("Vibe Sorcery completed!🎼🔮")
         print(f"Playlist generated with {len(self.playlist)} songs.")
         return self.playlist
@@ -1,11 +1,8 @@
 import numpy as np
-import librosa
 from src.utils import mood_tags
-from essentia.standard import MonoLoader, TensorflowPredictEffnetDiscogs, TensorflowPredictVGGish,TensorflowPredict2D
+from essentia.standard import MonoLoader, Resample, TensorflowPredictEffnetDiscogs, TensorflowPredictVGGish,TensorflowPredict2D
 
-# Load the audio file
 audio_path = 'input_song.wav'
-audio_data, sample_rate = librosa.load(audio_path)
 
 # Use  MTG models to extract features
 embeddings_model_moods = TensorflowPredictEffnetDiscogs(
@@ -28,53 +25,64 @@ av_classification_model = TensorflowPredict2D(
    output="model/Identity"
   )
 
-def get_arousal_valence(wav_filepath):
-  audio = MonoLoader(filename=wav_filepath, sampleRate=16000, resampleQuality=4)()
-  embeddings = embeddings_model_av(audio)
+def load_audio(wav_filepath):
+  # Decode the file once at 32kHz (what the mood models expect) and derive
+  # the 16kHz copy for VGGish in memory, instead of decoding twice
+  audio_32k = MonoLoader(filename=wav_filepath, sampleRate=32000)()
+  audio_16k = Resample(inputSampleRate=32000, outputSampleRate=16000, quality=4)(audio_32k)
+  return audio_32k, audio_16k
+
+
+def get_arousal_valence(audio_16k):
+  embeddings = embeddings_model_av(audio_16k)
   predictions = av_classification_model(embeddings)
   arousal, valence = np.mean(predictions, axis = 0)
   return arousal, valence
 
 
-def get_mood_activations_dict(wav_filepath):
-  audio = MonoLoader(filename=wav_filepath, sampleRate=32000)()
-  embeddings = embeddings_model_moods(audio)
+# Tag array aligned with the activation vector, for vectorized indexing
+mood_tags_arr = np.array(mood_tags)
+
+
+def get_mood_activations(audio_32k):
+  embeddings = embeddings_model_moods(audio_32k)
   activations = mood_classification_model(embeddings)
-  activation_avs = []
-  for i in range(0, len(activations[0])):
-    vals = [activations[j][i] for j in range(0, len(activations))]
-    # Note - this does the averaging bit
-    activation_avs.append(sum(vals)/len(vals))
-  activations_dict = {}
-  for ind, tag in enumerate(mood_tags):
-    activations_dict[tag] = activation_avs[ind]
-  return activations_dict
-
-def get_moods(mood_dict, threshold=0.05, k=5):
+  # Note - this does the averaging bit, vectorized across frames; the
+  # result stays a plain ndarray aligned with mood_tags
+  return np.asarray(activations, dtype=np.float32).mean(axis=0)
+
+
+def get_mood_activations_dict(audio_32k):
+  # Dict view for reporting only; the hot paths work on the ndarray
+  return dict(zip(mood_tags, get_mood_activations(audio_32k).tolist()))
+
+def get_moods(activation_avs, threshold=0.05, k=5):
     """
     Returns the moods that are above a certain threshold. If no moods are above the threshold, it returns the top k moods.
 
     Args:
-        mood_dict (dict): A dictionary mapping mood tags to activation values.
+        activation_avs (np.ndarray): Activation vector aligned with mood_tags.
         threshold (float): The threshold value to filter moods.
 
     Returns:
         list: A list of the mood tags that are above the threshold.
     """
 
-    # Sort the mood dictionary by activation values in descending order
-    sorted_moods = sorted(mood_dict.items(), key=lambda item: item[1], reverse=True)
-    moods = [mood[0] for mood in sorted_moods if mood[1] > threshold]
-    # If no moods are above the threshold, return the top k moods
-    if not moods:
-        return [mood[0] for mood in sorted_moods[:5]]
-    # Return the top k moods
-    return [mood[0] for mood in sorted_moods if mood[1] > threshold]
-
-mood_dict = get_mood_activations_dict(audio_path)
-top_moods = get_moods(mood_dict, threshold=0.06)
+    # Indices above the threshold; fall back to the top k moods, selected
+    # in O(K) with argpartition instead of sorting the whole dictionary
+    above = np.where(activation_avs > threshold)[0]
+    if above.size == 0:
+        above = np.argpartition(activation_avs, -k)[-k:]
+    # Order by activation value in descending order
+    above = above[np.argsort(-activation_avs[above])]
+    return mood_tags_arr[above].tolist()
+
+audio_32k, audio_16k = load_audio(audio_path)
+
+activation_avs = get_mood_activations(audio_32k)
+top_moods = get_moods(activation_avs, threshold=0.06)
 print("Top moods:", top_moods)
 
-arousal, valence = get_arousal_valence(audio_path)
+arousal, valence = get_arousal_valence(audio_16k)
 print("Valence:", valence)
 print("Arousal:", arousal)
\ No newline at end of file